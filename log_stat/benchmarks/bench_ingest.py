@@ -0,0 +1,90 @@
+'''
+Замер времени и пиковой памяти чтения истории журналов в зависимости от ее размера.
+Сравниваются три способа: вся история сразу в памяти (concat), потоковое
+схлопывание кусками (stream) и схлопывание файлов в пуле процессов (parallel).
+Для parallel память замеряется только в главном процессе.
+
+Запуск из папки log_stat:
+    python benchmarks/bench_ingest.py --rows 100000 400000 1600000 --matches 5000
+'''
+import argparse # для параметров запуска
+import os # для путей
+import sys # для импорта модулей программы
+import tempfile # для временной папки с историей
+import time # для замера времени
+import tracemalloc # для замера пиковой памяти
+import warnings
+import numpy as np # для генерации синтетической истории
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modules.logs import read_logs, read_logs_parallel, merge_logs, fold_logs # noqa: E402
+
+warnings.filterwarnings('ignore', category=FutureWarning)
+
+def make_history(path:str, rows:int, matches:int, files:int) -> None:
+    '''
+    генерирует синтетическую историю в формате журналов парсера:
+    каждый матч встречается много раз с разным счетом
+    :param path: папка для журналов
+    :param rows: сколько всего строк
+    :param matches: сколько разных матчей
+    :param files: на сколько файлов разбить историю
+    '''
+    rng = np.random.default_rng(42)
+    ids = 2614000000000000000 + rng.integers(0, matches, size=rows)
+    teams = np.array([f"Team {i}" for i in range(200)], dtype=object)
+    player_1 = teams[ids % 200]
+    player_2 = teams[(ids // 200) % 200]
+    scheduled = pd.to_datetime(1766400000 + (ids % 100000) * 60, unit="s").strftime("%Y-%m-%d %H:%M:%S")
+    times = pd.to_datetime(1766400000 + np.arange(rows) // 100, unit="s").strftime("%Y-%m-%d %H:%M:%S.%f")
+    scores = rng.integers(0, 6, size=(rows, 4))
+    df = pd.DataFrame({
+        "time": times, "id": ids, "scheduled": scheduled, "leage": "Bench League",
+        "player_1": player_1, "player_2": player_2,
+        "score_per_1_home": scores[:, 0], "score_per_1_away": scores[:, 1],
+        "res_score_home": scores[:, 2], "res_score_away": scores[:, 3],
+    })
+    for f_index, part in enumerate(np.array_split(df, files)):
+        part.to_csv(os.path.join(path, f"parser_results_{f_index}.csv"), sep=";", index=False, encoding="utf-8-sig")
+    return
+
+def measure(func) -> tuple:
+    '''
+    запускает функцию и замеряет время и пик выделенной памяти
+    :return: (секунды, пик памяти в МБ, результат)
+    '''
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20, result
+
+def main() -> None:
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--rows", type=int, nargs="+", default=[100000, 400000, 1600000], help="размеры истории в строках")
+    args.add_argument("--matches", type=int, default=5000, help="число разных матчей")
+    args.add_argument("--files", type=int, default=8, help="на сколько файлов разбить историю")
+    args.add_argument("--chunksize", type=int, default=100000, help="размер куска для потокового чтения")
+    args.add_argument("--workers", type=int, default=4, help="число процессов для parallel")
+    args = args.parse_args()
+
+    print(f"{'rows':>10} {'mode':>8} {'time, s':>9} {'peak, MB':>9} {'matches':>8}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = tmp_dir + "/"
+            make_history(path=path, rows=rows, matches=args.matches, files=args.files)
+            modes = {
+                "concat": lambda: merge_logs(df=pd.concat(list(read_logs(path=path, logs_format="csv")), ignore_index=True)),
+                "stream": lambda: fold_logs(frames=read_logs(path=path, logs_format="csv", chunksize=args.chunksize)),
+                "parallel": lambda: fold_logs(frames=read_logs_parallel(path=path, logs_format="csv", chunksize=args.chunksize, workers=args.workers)),
+            }
+            for mode, func in modes.items():
+                elapsed, peak, result = measure(func)
+                print(f"{rows:>10} {mode:>8} {elapsed:>9.2f} {peak:>9.1f} {len(result):>8}")
+    return
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+'''
+Замер полного прогона log_stat: чтение истории (get_data) и подсчет статистики
+(Log_stat._stat_df) на синтетических журналах разного размера.
+Выводятся время, пропускная способность в строках в секунду и пик памяти каждого этапа.
+После замера итоговая таблица сохраняется во всех форматах и читается обратно,
+чтобы запись, теряющая строки, не прошла незамеченной.
+
+Запуск из папки log_stat:
+    python benchmarks/bench_stats.py --rows 100000 400000 1600000 --matches 5000
+'''
+import argparse # для параметров запуска
+import logging # для тихого логгера log_stat
+import os # для путей
+import sys # для импорта модулей программы
+import tempfile # для временной папки с историей
+import ujson as json # для конфига прогона
+import pandas as pd # для чтения сохраненных таблиц
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from main import get_data, Log_stat # noqa: E402
+from modules.output import save_table # noqa: E402
+from bench_ingest import make_history, measure # noqa: E402
+
+FORMATS = ["csv", "parquet", "xlsxwriter", "openpyxl"]
+
+def write_config(path:str, chunksize:int, output_format:str) -> None:
+    '''
+    кладет во временную папку конфиг, с которым Log_stat читает историю оттуда же
+    '''
+    config = {
+        "log_to_file": False,
+        "path_to_logs": "./logs/",
+        "logs_format": "csv",
+        "verbose": False,
+        "incremental": False,
+        "checkpoint_path": "./checkpoint/",
+        "chunksize": chunksize,
+        "workers": 1,
+        "output_format": output_format,
+    }
+    with open(os.path.join(path, "config.json"), "w") as config_file:
+        config_file.write(json.dumps(config))
+    return
+
+def check_tables(df:pd.DataFrame, logger:object) -> None:
+    '''
+    сохраняет таблицу во всех форматах, читает обратно и сверяет число строк и айди матчей
+    :param df: таблица матчей после _stat_df
+    '''
+    readers = {
+        "csv": lambda path: pd.read_csv(path, sep=";", encoding="utf-8-sig"),
+        "parquet": pd.read_parquet,
+        "xlsxwriter": lambda path: pd.read_excel(path, index_col=0),
+        "openpyxl": lambda path: pd.read_excel(path, index_col=0),
+    }
+    for output_format in FORMATS:
+        path = save_table(df=df, name=f"check_{output_format}", output_format=output_format, logger=logger)
+        saved = readers[output_format](path)
+        if len(saved) != len(df) or saved["id"].astype(str).tolist() != df["id"].astype(str).tolist():
+            raise AssertionError(f"{output_format}: {saved['id'].notna().sum()} of {len(df)} rows read back from {path}")
+    print(f"{'tables':>10} {len(df)} rows read back in {', '.join(FORMATS)}")
+    return
+
+def main() -> None:
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--rows", type=int, nargs="+", default=[100000, 400000, 1600000], help="размеры истории в строках")
+    args.add_argument("--matches", type=int, default=5000, help="число разных матчей")
+    args.add_argument("--files", type=int, default=8, help="на сколько файлов разбить историю")
+    args.add_argument("--chunksize", type=int, default=100000, help="размер куска для потокового чтения")
+    args.add_argument("--output-format", default="csv", help="формат итоговых таблиц")
+    args = args.parse_args()
+
+    print(f"{'rows':>10} {'stage':>8} {'time, s':>9} {'rows/s':>11} {'peak, MB':>9} {'matches':>8}")
+    cwd = os.getcwd()
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.makedirs(os.path.join(tmp_dir, "logs"))
+            make_history(path=os.path.join(tmp_dir, "logs") + "/", rows=rows, matches=args.matches, files=args.files)
+            write_config(path=tmp_dir, chunksize=args.chunksize, output_format=args.output_format)
+            os.chdir(tmp_dir) # Log_stat читает конфиг и пишет таблицы в текущую папку
+            try:
+                stat = Log_stat()
+                stat._logger.setLevel(logging.WARNING)
+                elapsed, peak, df = measure(lambda: get_data(path="./logs/", chunksize=args.chunksize))
+                print(f"{rows:>10} {'get_data':>8} {elapsed:>9.2f} {rows / elapsed:>11.0f} {peak:>9.1f} {len(df):>8}")
+                elapsed, peak, _ = measure(lambda: stat._stat_df(df=df))
+                print(f"{rows:>10} {'stat_df':>8} {elapsed:>9.2f} {len(df) / elapsed:>11.0f} {peak:>9.1f} {len(df):>8}")
+                check_tables(df=df, logger=stat._logger)
+            finally:
+                os.chdir(cwd)
+    return
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,10 @@ import pandas as pd # для удобной работы с логами
 import ujson as json # для упаковки/распаковки объектов
 from pathlib import Path # для проверки путей
 from modules.logger import Logger
-import os # для путей логов
+from modules.logs import read_logs, read_logs_parallel, fold_logs # чтение и схлопывание журналов
+from modules.stats import team_groups, winners, count_wins # подсчет статистики
+from modules.checkpoint import Checkpoint # состояние для инкрементального режима
+from modules.output import save_table # запись итоговых таблиц
 
 # используется одна из функций pd, из старых версий
 import warnings
@@ -17,57 +20,22 @@ def get_config() -> dict:
         config = json.loads(config.read())
     return config
 
-def get_data(path:str) -> pd.DataFrame | None:
+def get_data(path:str, logs_format:str="csv", chunksize:int | None=None, workers:int=1) -> pd.DataFrame | None:
     '''  
-    получает всю информацию из папки с логами и объединяет ее в один объект
+    получает всю информацию из папки с логами и объединяет ее в один объект.
+    Журналы читаются потоково, поэтому память зависит от числа матчей, а не строк
     :param path: путь к папке с логами
+    :param logs_format: формат логов - csv или parquet
+    :param chunksize: сколько строк читать за раз, None - по файлу целиком
+    :param workers: сколько процессов читают файлы параллельно, 1 - без пула
     :return: датафрейм или ничего
     '''
-    header = ["time", "id", "scheduled", "player_1", "player_2", "home_score_per_1", "away_score_per_1", "home_score", "away_score"]
-    main_df = pd.DataFrame(columns=header)
-    ids = []
-    for file in os.listdir(path):
-        file_path = path + file 
-        df = pd.read_csv(file_path, delimiter=";", header=None, names=header)
-        for _, row in df.iterrows():
-            if row["id"] not in ids: # создание новой строчки
-                main_df = pd.concat([main_df, row.to_frame().T], ignore_index=True)
-                ids.append(row["id"])
-            else: # обновление существующей
-                old_row = main_df[main_df['id'] == row["id"]].iloc[0]
-                old_row_index = main_df[main_df['id'] == row["id"]].index[0]
-                keys = ["home_score_per_1", "away_score_per_1", "home_score", "away_score"]
-                for k in keys:
-                    if old_row[k] < row[k]:
-                        main_df.loc[old_row_index, k] = row[k]
-    return main_df
-    
-def winner(row:pd.DataFrame) -> str:
-    '''  
-    определяет кто выиграл в матче
-    :param row: датафрейм с матчем
-    :return: имя победившей команды или draw (ничья)
-    '''
-    if row['home_score'] > row['away_score']:
-        return row['player_1']
-    elif row['home_score'] < row['away_score']:
-        return row['player_2']
+    if workers > 1:
+        frames = read_logs_parallel(path=path, logs_format=logs_format, chunksize=chunksize, workers=workers)
     else:
-        return 'draw'
+        frames = read_logs(path=path, logs_format=logs_format, chunksize=chunksize)
+    return fold_logs(frames=frames)
     
-def count_wins(group:pd.DataFrame) -> pd.Series:
-    '''  
-    считает кол-во подеб в рамках группы (одни и те же участники)
-    :param group: группа матчей с одиними и теми же участниками
-    :return: датафрейм с подсчитанными победами и ничьими
-    '''
-    team1, team2 = group.name
-    wins_team_1 = ((group['winner'] == team1)).sum()
-    wins_team_2 = ((group['winner'] == team2)).sum()
-    draws = ((group['winner'] == 'draw')).sum()
-    all = wins_team_1 + wins_team_2 + draws
-    return pd.Series({'team1': team1, 'team2': team2, 'all': all, 'wins_team_1': wins_team_1, 'wins_team_2': wins_team_2, 'draws': draws})
-
 class Log_stat():
     '''  
     главный класс подсчета статистики
@@ -79,24 +47,30 @@ class Log_stat():
             log_to_file=self._config["log_to_file"]
         ).logger
     
-    def _stat_df(self, df:pd.DataFrame) -> None:
+    def _stat_df(self, df:pd.DataFrame, counter_df:pd.DataFrame | None=None) -> None:
         '''  
         считает статистику по всему файлу бд
+        :param df: датафрейм с матчами
+        :param counter_df: уже посчитанные победы и ничьи (из чекпоинта) или None
         '''
-        df["team_group"] = df.apply(lambda row: tuple(sorted([row['player_1'], row['player_2']])), axis=1)
-        df["winner"] = df.apply(winner, axis=1)
+        team_1, team_2 = team_groups(df=df)
+        df["team_group"] = list(zip(team_1, team_2))
+        df["winner"] = winners(df=df)
         df["id"] = df["id"].astype(str)
-        df.to_excel("merge.xlsx")
-        group_df = df.groupby('team_group')
-        counter_df = group_df.apply(count_wins).reset_index(drop=True)
-        counter_df.to_excel("./test.xlsx")
+        save_table(df=df, name="merge", output_format=self._config["output_format"], logger=self._logger)
+        if counter_df is None:
+            counter_df = count_wins(winner=df["winner"].to_numpy(dtype=object), team_1=team_1, team_2=team_2)
+        save_table(df=counter_df, name="./test", output_format=self._config["output_format"], logger=self._logger)
         # group_df - объект с группированными строчками по командам, то есть в первой группе
         # все матчи между командой_1 и командой_2 условно и т.д.
 
         # counter_df - объект с рассчитанными победами и ничьими для каждой группы 
         # в каждой строчке: команда_1, команда_2, сколько раз выиграла 1 команда, сколько раз выиграла 2 команда, сколько раз была ничья
 
-        # пример обработки каждой группы
+        # пример обработки каждой группы, построчный вывод включается в конфиге
+        if not self._config["verbose"]:
+            return
+        group_df = df.groupby('team_group')
         for teams, group in group_df:
             print(f"Матчи между командами: {teams}")
             for g_i, g_r in group.iterrows():
@@ -106,9 +80,15 @@ class Log_stat():
         return
 
     def main(self) -> None:
-        df = get_data(path=self._config["path_to_logs"])
+        counter_df = None
+        if self._config["incremental"]: # дочитываем только новые строки
+            checkpoint = Checkpoint(path=self._config["checkpoint_path"], logger=self._logger)
+            checkpoint.update(path=self._config["path_to_logs"], logs_format=self._config["logs_format"], chunksize=self._config["chunksize"])
+            df, counter_df = checkpoint.matches.copy(), checkpoint.counters
+        else:
+            df = get_data(path=self._config["path_to_logs"], logs_format=self._config["logs_format"], chunksize=self._config["chunksize"], workers=self._config["workers"])
         if not df.empty:
-            self._stat_df(df=df)        
+            self._stat_df(df=df, counter_df=counter_df)        
         else:
             return
 
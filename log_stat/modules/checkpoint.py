@@ -0,0 +1,121 @@
+import pandas as pd # для хранения состояния
+import ujson as json # для сохранения смещений файлов
+import os # для путей логов и чекпоинта
+from modules.logs import HEADER, SCORE_KEYS, read_csv_tail, parquet_files, read_parquet_file, merge_logs, fold_logs
+from modules.stats import pair_counters
+
+# сохраненное между запусками состояние статистики
+class Checkpoint():
+    '''
+    Помнит, какие файлы (и до какого байта) уже прочитаны, а также итоговые
+    матчи и счетчики побед по парам, чтобы при следующем запуске дочитывать
+    только новые строки вместо пересчета всей истории
+    '''
+    def __init__(self, path:str, logger:object) -> None:
+        self._path = path # папка с файлами чекпоинта
+        self._logger = logger
+        self._offsets = {} # путь к журналу -> сколько байт уже прочитано
+        self.matches = pd.DataFrame(columns=HEADER) # одна строка на матч
+        self.counters = pd.DataFrame(columns=["team1", "team2", "all", "wins_team_1", "wins_team_2", "draws"])
+        self._load()
+        return
+
+    def _load(self) -> None:
+        '''
+        Подгружает чекпоинт с диска, если он там есть
+        '''
+        offsets_path = os.path.join(self._path, "offsets.json")
+        if not os.path.exists(offsets_path):
+            return
+        with open(offsets_path, encoding="utf-8") as offsets_file:
+            self._offsets = json.loads(offsets_file.read())
+        # чекпоинты прежних версий хранили айди и счет как object
+        self.matches = pd.read_pickle(os.path.join(self._path, "matches.pkl")).infer_objects()
+        self.counters = pd.read_pickle(os.path.join(self._path, "counters.pkl"))
+        self._logger.info(f"Checkpoint is loaded ({len(self._offsets)} files, {len(self.matches)} matches)")
+        return
+
+    def _save(self) -> None:
+        '''
+        Сохраняет чекпоинт. Смещения пишутся последними: если запись прервется,
+        новые строки просто прочитаются еще раз, а схлопывание по максимуму это переживет
+        '''
+        os.makedirs(self._path, exist_ok=True)
+        self.matches.to_pickle(os.path.join(self._path, "matches.pkl"))
+        self.counters.to_pickle(os.path.join(self._path, "counters.pkl"))
+        with open(os.path.join(self._path, "offsets.json"), "w", encoding="utf-8") as offsets_file:
+            offsets_file.write(json.dumps(self._offsets))
+        return
+
+    def _read_new_rows(self, path:str, logs_format:str, chunksize:int | None):
+        '''
+        Дочитывает из журналов только то, что появилось после прошлого запуска
+        :param path: путь к папке с логами
+        :param logs_format: формат логов - csv или parquet
+        :param chunksize: сколько строк читать за раз
+        :return: генератор датафреймов с новыми строками
+        '''
+        if logs_format == "parquet": # файлы датасета неизменяемы - читаем только новые
+            files = parquet_files(path=path)
+            # файлы сбросов удаляются парсером после склейки, их смещения больше не нужны;
+            # склеенный файл читается как новый, а его строки схлопываются с уже известными
+            known = set(files)
+            self._offsets = {file_path: offset for file_path, offset in self._offsets.items() if file_path in known or not file_path.endswith(".parquet")}
+            for file_path in files:
+                if file_path in self._offsets: continue
+                yield from read_parquet_file(file_path=file_path, chunksize=chunksize)
+                self._offsets[file_path] = os.path.getsize(file_path)
+            return
+        for file in sorted(os.listdir(path)):
+            file_path = path + file
+            if not os.path.isfile(file_path): continue
+            offset = self._offsets.get(file_path, 0)
+            if os.path.getsize(file_path) < offset: # файл перезаписан - читаем заново
+                self._logger.warning(f"File {file_path} is shorter than checkpoint, reading it again")
+                offset = 0
+            if os.path.getsize(file_path) == offset: continue
+            for df, offset in read_csv_tail(file_path=file_path, offset=offset, chunksize=chunksize):
+                self._offsets[file_path] = offset
+                if not df.empty:
+                    yield df
+        return
+
+    def update(self, path:str, logs_format:str, chunksize:int | None=None) -> None:
+        '''
+        Вливает новые строки журналов в сохраненное состояние и пересчитывает
+        счетчики только для пар команд, чьи матчи изменились
+        :param path: путь к папке с логами
+        :param logs_format: формат логов - csv или parquet
+        :param chunksize: сколько строк читать за раз
+        '''
+        new_rows = fold_logs(frames=self._read_new_rows(path=path, logs_format=logs_format, chunksize=chunksize))
+        if new_rows.empty:
+            self._logger.info("No new rows in logs")
+            return
+        if self.matches.empty: # первый запуск: склейка с пустым состоянием сделала бы колонки object
+            merged = new_rows
+        else:
+            merged = merge_logs(df=pd.concat([self.matches, new_rows], ignore_index=True))
+
+        # матчи, которые появились или у которых вырос счет
+        touched_ids = new_rows["id"].unique()
+        old = self.matches[self.matches["id"].isin(touched_ids)]
+        new = merged[merged["id"].isin(touched_ids)]
+        old_scores = old.set_index("id")[SCORE_KEYS]
+        new_scores = new.set_index("id")[SCORE_KEYS].reindex(old_scores.index)
+        unchanged_ids = old_scores.index[(old_scores == new_scores).all(axis=1)]
+        old = old[~old["id"].isin(unchanged_ids)]
+        new = new[~new["id"].isin(unchanged_ids)]
+
+        # вычитаем вклад старых версий матчей и добавляем вклад новых
+        counters = self.counters.set_index(["team1", "team2"])
+        if not old.empty:
+            counters = counters.sub(pair_counters(df=old).set_index(["team1", "team2"]), fill_value=0)
+        if not new.empty:
+            counters = counters.add(pair_counters(df=new).set_index(["team1", "team2"]), fill_value=0)
+        counters = counters[counters["all"] != 0].sort_index().astype(int)
+        self.counters = counters.reset_index()
+        self.matches = merged
+        self._save()
+        self._logger.info(f"Checkpoint is updated ({len(new_rows)} touched matches, {len(new)} changed matches)")
+        return
@@ -0,0 +1,198 @@
+import pandas as pd # для удобной работы с логами
+import io # для разбора дочитанного куска файла
+import os # для путей логов
+from concurrent.futures import ProcessPoolExecutor # для параллельного чтения файлов
+from itertools import repeat, islice # для передачи одинаковых параметров в пул и чтения кусками
+
+# соответствие колонок журнала парсера колонкам анализа
+LOG_COLUMNS = {
+    "time": "time",
+    "id": "id",
+    "scheduled": "scheduled",
+    "player_1": "player_1",
+    "player_2": "player_2",
+    "score_per_1_home": "home_score_per_1",
+    "score_per_1_away": "away_score_per_1",
+    "res_score_home": "home_score",
+    "res_score_away": "away_score",
+}
+HEADER = ["time", "id", "scheduled", "player_1", "player_2", "home_score_per_1", "away_score_per_1", "home_score", "away_score"]
+SCORE_KEYS = ["home_score_per_1", "away_score_per_1", "home_score", "away_score"]
+
+def csv_layout(file_path:str) -> tuple:
+    '''
+    определяет устройство csv-журнала парсера. Поддерживаются старые журналы из 9 колонок
+    без лиги и новые из 10 колонок с лигой, с заголовком или без
+    :param file_path: путь к файлу
+    :return: пара (есть ли строка заголовка, названия колонок файла)
+    '''
+    with open(file_path, encoding="utf-8-sig") as log_file:
+        first_line = log_file.readline().rstrip("\r\n")
+    if first_line.startswith("time;"): # журнал с заголовком
+        return True, [LOG_COLUMNS.get(column, column) for column in first_line.split(";")]
+    if first_line.count(";") == len(HEADER): # есть колонка лиги
+        return False, HEADER[:3] + ["leage"] + HEADER[3:]
+    return False, HEADER
+
+def read_csv_log(file_path:str, chunksize:int | None=None):
+    '''
+    читает один csv-журнал парсера целиком или кусками по chunksize строк
+    :param file_path: путь к файлу
+    :param chunksize: сколько строк читать за раз, None - весь файл сразу
+    :return: генератор датафреймов с колонками HEADER
+    '''
+    has_header, names = csv_layout(file_path=file_path)
+    reader = pd.read_csv(file_path, delimiter=";", header=None, names=names, skiprows=int(has_header), encoding="utf-8-sig", chunksize=chunksize)
+    if chunksize is None:
+        yield reader[HEADER]
+        return
+    with reader:
+        for df in reader:
+            yield df[HEADER]
+
+def read_csv_tail(file_path:str, offset:int, chunksize:int | None=None):
+    '''
+    дочитывает csv-журнал начиная с байта offset кусками по chunksize строк. Берутся только полные строки,
+    чтобы недописанная парсером строка была прочитана при следующем запуске
+    :param file_path: путь к файлу
+    :param offset: с какого байта читать
+    :param chunksize: сколько строк читать за раз, None - весь остаток файла сразу
+    :return: генератор пар (датафрейм с колонками HEADER, offset после этого куска)
+    '''
+    has_header, names = csv_layout(file_path=file_path)
+    with open(file_path, "rb") as log_file:
+        log_file.seek(offset)
+        if offset == 0:
+            if log_file.read(3) != b"\xef\xbb\xbf": # BOM
+                log_file.seek(0)
+            if has_header:
+                log_file.readline()
+            offset = log_file.tell()
+        while True:
+            lines = list(islice(log_file, chunksize)) if chunksize else log_file.readlines()
+            is_tail = bool(lines) and not lines[-1].endswith(b"\n")
+            if is_tail: # недописанная строка бывает только в конце файла
+                lines.pop()
+            if not lines:
+                return
+            data = b"".join(lines)
+            offset += len(data)
+            if data.strip():
+                yield pd.read_csv(io.BytesIO(data), delimiter=";", header=None, names=names)[HEADER], offset
+            else:
+                yield pd.DataFrame(columns=HEADER), offset
+            if is_tail:
+                return
+
+def parquet_files(path:str) -> list:
+    '''
+    находит все файлы parquet-датасета парсера
+    :param path: путь к папке с логами
+    :return: отсортированный список путей к файлам
+    '''
+    files = []
+    for root, _, names in os.walk(path + "parquet"):
+        files.extend(os.path.join(root, name) for name in names if name.endswith(".parquet"))
+    return sorted(files)
+
+def _from_parquet(df:pd.DataFrame) -> pd.DataFrame:
+    '''
+    приводит прочитанный из parquet кусок к колонкам анализа. Команды хранятся
+    словарем и читаются как category, а их надо сравнивать между собой как строки
+    '''
+    df = df.rename(columns=LOG_COLUMNS)[HEADER]
+    df[["player_1", "player_2"]] = df[["player_1", "player_2"]].astype(object)
+    return df
+
+def read_parquet_file(file_path:str, chunksize:int | None=None):
+    '''
+    читает один файл parquet-датасета целиком или кусками, поднимая с диска только нужные колонки
+    :param file_path: путь к файлу
+    :param chunksize: сколько строк читать за раз, None - весь файл сразу
+    :return: генератор датафреймов с колонками HEADER
+    '''
+    if chunksize is None:
+        yield _from_parquet(pd.read_parquet(file_path, columns=list(LOG_COLUMNS.keys())))
+        return
+    import pyarrow.parquet as pq # опциональная зависимость, нужна только для parquet
+    for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunksize, columns=list(LOG_COLUMNS.keys())):
+        yield _from_parquet(batch.to_pandas())
+
+def log_files(path:str, logs_format:str) -> list:
+    '''
+    находит все файлы журналов в папке с логами
+    :param path: путь к папке с логами
+    :param logs_format: csv - файлы через ";", parquet - датасет парсера в папке parquet
+    :return: отсортированный список путей к файлам
+    '''
+    if logs_format == "parquet":
+        return parquet_files(path=path)
+    return [path + file for file in sorted(os.listdir(path)) if os.path.isfile(path + file)]
+
+def read_log_file(file_path:str, logs_format:str, chunksize:int | None=None):
+    '''
+    читает один файл журнала нужного формата
+    :return: генератор датафреймов с колонками HEADER
+    '''
+    if logs_format == "parquet":
+        # читаются только нужные колонки, остальные (лига, дата) с диска не поднимаются
+        return read_parquet_file(file_path=file_path, chunksize=chunksize)
+    return read_csv_log(file_path=file_path, chunksize=chunksize)
+
+def read_logs(path:str, logs_format:str, chunksize:int | None=None):
+    '''
+    по очереди отдает датафреймы журналов из папки с логами
+    :param path: путь к папке с логами
+    :param logs_format: csv - файлы через ";", parquet - датасет парсера в папке parquet
+    :param chunksize: сколько строк читать за раз, None - по файлу целиком
+    :return: генератор датафреймов
+    '''
+    for file_path in log_files(path=path, logs_format=logs_format):
+        yield from read_log_file(file_path=file_path, logs_format=logs_format, chunksize=chunksize)
+
+def reduce_log_file(file_path:str, logs_format:str, chunksize:int | None=None) -> pd.DataFrame:
+    '''
+    читает файл журнала и сразу схлопывает его до строки на матч.
+    Выполняется в отдельном процессе, поэтому должна быть функцией уровня модуля
+    :return: датафрейм с одной строкой на айди
+    '''
+    return fold_logs(frames=read_log_file(file_path=file_path, logs_format=logs_format, chunksize=chunksize))
+
+def read_logs_parallel(path:str, logs_format:str, chunksize:int | None, workers:int):
+    '''
+    схлопывает файлы журналов параллельно в пуле процессов и отдает частичные
+    результаты в порядке файлов, чтобы итог не зависел от того, кто закончил первым
+    :param path: путь к папке с логами
+    :param logs_format: формат логов - csv или parquet
+    :param chunksize: сколько строк читать за раз внутри одного файла
+    :param workers: число процессов
+    :return: генератор схлопнутых датафреймов, по одному на файл
+    '''
+    files = log_files(path=path, logs_format=logs_format)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(reduce_log_file, files, repeat(logs_format), repeat(chunksize))
+
+def merge_logs(df:pd.DataFrame) -> pd.DataFrame:
+    '''
+    схлопывает строки журнала до одной на матч: описание матча берется из первой
+    встреченной строки, счет - максимальный за все строки
+    :param df: все строки журналов подряд
+    :return: датафрейм с одной строкой на айди в порядке первого появления
+    '''
+    main_df = df.drop_duplicates(subset="id", keep="first").set_index("id")
+    main_df[SCORE_KEYS] = df.groupby("id", sort=False)[SCORE_KEYS].max()
+    return main_df.reset_index()[HEADER]
+
+def fold_logs(frames) -> pd.DataFrame:
+    '''
+    потоково схлопывает куски журналов: каждый кусок сразу вливается в итог,
+    поэтому в памяти одновременно лежат только итог (строка на матч) и один кусок
+    :param frames: итерируемый набор датафреймов с колонками HEADER
+    :return: датафрейм с одной строкой на айди в порядке первого появления
+    '''
+    main_df = None
+    for df in frames:
+        main_df = merge_logs(df=df if main_df is None else pd.concat([main_df, df], ignore_index=True))
+    if main_df is None:
+        return pd.DataFrame(columns=HEADER)
+    return main_df
@@ -0,0 +1,75 @@
+import pandas as pd # для записи таблиц
+from datetime import datetime # для ячеек с датой в Excel
+
+# максимальное число строк на листе Excel (вместе со строкой заголовка)
+EXCEL_MAX_ROWS = 1048576
+
+def _excel_value(value:object) -> object:
+    '''
+    приводит значение ячейки к тому, что записал бы pandas: пропуски - пустые ячейки,
+    числа, строки и даты как есть, остальное (например, кортежи пар команд) - строкой
+    '''
+    if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)):
+        return None
+    if isinstance(value, (str, int, float, bool, datetime)):
+        return value
+    return str(value)
+
+def _write_xlsx(df:pd.DataFrame, path:str) -> None:
+    '''
+    пишет таблицу в Excel через xlsxwriter в режиме constant_memory: строки сразу уходят на диск.
+    В этом режиме ячейки принимаются только по порядку строк, а df.to_excel пишет по колонкам
+    и теряет все строки, кроме последней, поэтому строки пишутся здесь вручную
+    в той же раскладке, что у to_excel: индекс в первой колонке, заголовок в первой строке
+    :param df: сохраняемый датафрейм
+    :param path: путь к файлу
+    '''
+    import xlsxwriter # опциональная зависимость, нужна только для этого формата
+    with xlsxwriter.Workbook(path, {"constant_memory": True}) as workbook:
+        worksheet = workbook.add_worksheet("Sheet1")
+        header_format = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+        index_format = workbook.add_format({"bold": True, "border": 1, "valign": "top"})
+        datetime_format = workbook.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"})
+        worksheet.write_row(0, 1, [str(column) for column in df.columns], header_format)
+        for r_index, row in enumerate(df.itertuples(name=None), start=1):
+            worksheet.write(r_index, 0, _excel_value(row[0]), index_format)
+            for c_index, value in enumerate(row[1:], start=1):
+                value = _excel_value(value)
+                if value is None:
+                    continue
+                if isinstance(value, datetime):
+                    worksheet.write_datetime(r_index, c_index, value, datetime_format)
+                else:
+                    worksheet.write(r_index, c_index, value)
+    return
+
+def save_table(df:pd.DataFrame, name:str, output_format:str, logger:object) -> str:
+    '''
+    сохраняет таблицу в выбранном формате
+    :param df: сохраняемый датафрейм
+    :param name: путь к файлу без расширения
+    :param output_format: csv, parquet, xlsxwriter (Excel в режиме constant_memory)
+    или openpyxl (прежний медленный Excel)
+    :param logger: логгер программы
+    :return: путь к записанному файлу
+    '''
+    if output_format in ("xlsxwriter", "openpyxl") and len(df) >= EXCEL_MAX_ROWS:
+        logger.warning(f"{len(df)} rows don't fit into Excel sheet, {name} is saved as csv")
+        output_format = "csv"
+
+    if output_format == "csv":
+        path = f"{name}.csv"
+        df.to_csv(path, sep=";", index=False, encoding="utf-8-sig")
+    elif output_format == "parquet":
+        path = f"{name}.parquet"
+        df.to_parquet(path, index=False)
+    elif output_format == "xlsxwriter":
+        path = f"{name}.xlsx"
+        _write_xlsx(df=df, path=path)
+    elif output_format == "openpyxl":
+        path = f"{name}.xlsx"
+        df.to_excel(path, engine="openpyxl")
+    else:
+        raise ValueError(f"Unknown output format {output_format}, expected csv, parquet, xlsxwriter or openpyxl")
+    logger.info(f"Table saved to {path} ({len(df)} rows)")
+    return path
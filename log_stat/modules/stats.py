@@ -0,0 +1,55 @@
+import pandas as pd # для удобной работы с логами
+import numpy as np # для векторного подсчета статистики
+
+def team_groups(df:pd.DataFrame) -> tuple:
+    '''  
+    раскладывает участников каждого матча в отсортированную пару без построчного apply
+    :param df: датафрейм с матчами
+    :return: два массива - первая и вторая команда пары по алфавиту
+    '''
+    player_1 = df["player_1"].to_numpy(dtype=object)
+    player_2 = df["player_2"].to_numpy(dtype=object)
+    swap = (df["player_1"] > df["player_2"]).to_numpy()
+    return np.where(swap, player_2, player_1), np.where(swap, player_1, player_2)
+
+def winners(df:pd.DataFrame) -> np.ndarray:
+    '''  
+    определяет кто выиграл в каждом матче
+    :param df: датафрейм с матчами
+    :return: массив с именем победившей команды или draw (ничья) для каждого матча
+    '''
+    home_score = df["home_score"].to_numpy()
+    away_score = df["away_score"].to_numpy()
+    return np.select(
+        [home_score > away_score, home_score < away_score],
+        [df["player_1"].to_numpy(dtype=object), df["player_2"].to_numpy(dtype=object)],
+        default="draw"
+    )
+    
+def count_wins(winner:np.ndarray, team_1:np.ndarray, team_2:np.ndarray) -> pd.DataFrame:
+    '''  
+    считает кол-во подеб в рамках каждой группы (одни и те же участники) одной агрегацией
+    :param winner: победитель каждого матча или draw
+    :param team_1: первая команда пары для каждого матча
+    :param team_2: вторая команда пары для каждого матча
+    :return: датафрейм с подсчитанными победами и ничьими
+    '''
+    flags = pd.DataFrame({
+        "team1": team_1,
+        "team2": team_2,
+        "wins_team_1": winner == team_1,
+        "wins_team_2": winner == team_2,
+        "draws": winner == "draw",
+    })
+    counter_df = flags.groupby(["team1", "team2"]).sum()
+    counter_df.insert(0, "all", counter_df["wins_team_1"] + counter_df["wins_team_2"] + counter_df["draws"])
+    return counter_df.reset_index()
+
+def pair_counters(df:pd.DataFrame) -> pd.DataFrame:
+    '''  
+    считает победы и ничьи по парам команд сразу по датафрейму матчей
+    :param df: датафрейм с матчами
+    :return: датафрейм с подсчитанными победами и ничьими
+    '''
+    team_1, team_2 = team_groups(df=df)
+    return count_wins(winner=winners(df=df), team_1=team_1, team_2=team_2)
@@ -0,0 +1,114 @@
+'''
+Бенчмарк парсера: синтетические кадры проигрываются через URL_Parser.get_data_from_url
+с локального Fake_Api, затем замеряется запись журнала (write_log + сброс буфера).
+Для каждого размера кадра выводятся пропускная способность, задержки и пик памяти.
+
+Запуск из папки parser:
+    python benchmarks/bench_parser.py --events 200 1000 4000 --frames 20
+'''
+import argparse # для параметров запуска
+import logging # для тихого логгера парсера
+import os # для путей
+import statistics # для перцентилей задержек
+import sys # для импорта модулей программы
+import tempfile # для временной папки с журналом
+import time # для замера времени
+import tracemalloc # для замера пиковой памяти
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modules.parser import URL_Parser # noqa: E402
+from frames import make_frames # noqa: E402
+from fake_api import Fake_Api # noqa: E402
+
+def make_parser(path:str) -> URL_Parser:
+    '''
+    создает парсер, который пишет журнал во временную папку и не запускает браузер
+    :param path: временная папка
+    '''
+    os.makedirs(os.path.join(path, "res_logs"), exist_ok=True)
+    os.chdir(path)
+    logger = logging.getLogger("bench")
+    logger.setLevel(logging.WARNING)
+    return URL_Parser(
+        parent_url="",
+        delay=0,
+        url_pattern="",
+        logger=logger,
+        connection_timeout=10,
+        time_for_reset=10**9,
+        url_cache_path=os.path.join(path, "url_cache.json"),
+        log_flush_rows=10**9,
+        log_flush_interval=10**9
+    )
+
+def percentile(values:list, q:int) -> float:
+    '''
+    :return: q-й перцентиль в миллисекундах
+    '''
+    return statistics.quantiles(values, n=100)[q - 1] * 1000 if len(values) > 1 else values[0] * 1000
+
+def bench_replay(events:int, frames:int, changed:float) -> dict:
+    '''
+    проигрывает кадры через get_data_from_url и замеряет запись журнала
+    :return: словарь с результатами
+    '''
+    payloads = make_frames(events=events, frames=frames, changed=changed)
+    api = Fake_Api(frames={"/live": payloads})
+    url = api.start() + "/live"
+    cwd = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            parser = make_parser(path=tmp_dir)
+            latencies = []
+            started = time.perf_counter()
+            for _ in range(frames):
+                frame_started = time.perf_counter()
+                parser.get_data_from_url(url=url)
+                latencies.append(time.perf_counter() - frame_started)
+            replay_time = time.perf_counter() - started
+
+            # пик памяти замеряется отдельным коротким проходом: tracemalloc сильно замедляет разбор
+            tracemalloc.start()
+            for _ in range(min(frames, 3)):
+                parser.get_data_from_url(url=url)
+            _, replay_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            # запись журнала: все матчи считаются изменившимися
+            changed_matches = list(parser._competitions_all.values())
+            started = time.perf_counter()
+            parser.write_log(data=changed_matches)
+            parser._log_writer.flush()
+            write_time = time.perf_counter() - started
+            parser.close()
+    finally:
+        os.chdir(cwd)
+        api.stop()
+    return {
+        "events": events,
+        "payload_kb": sum(map(len, payloads)) / len(payloads) / 1024,
+        "frames_s": frames / replay_time,
+        "events_s": events * frames / replay_time,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "peak_mb": replay_peak / 2**20,
+        "matches": len(changed_matches),
+        "rows_s": len(changed_matches) / write_time if write_time else 0,
+    }
+
+def main() -> None:
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--events", type=int, nargs="+", default=[200, 1000, 4000], help="размеры кадра в событиях")
+    args.add_argument("--frames", type=int, default=20, help="сколько кадров проиграть")
+    args.add_argument("--changed", type=float, default=0.1, help="доля матчей, меняющих счет в каждом кадре")
+    args = args.parse_args()
+
+    columns = ["events", "payload_kb", "frames_s", "events_s", "p50_ms", "p95_ms", "peak_mb", "matches", "rows_s"]
+    print(" ".join(f"{column:>10}" for column in columns))
+    for events in args.events:
+        result = bench_replay(events=events, frames=args.frames, changed=args.changed)
+        print(" ".join(f"{result[column]:>10.1f}" if isinstance(result[column], float) else f"{result[column]:>10}" for column in columns))
+    return
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+'''
+Локальная замена demoapi.betby.com для бенчмарков: по кругу отдает заранее
+подготовленные кадры, на неизвестные пути отвечает 404
+'''
+import threading # сервер работает в фоновом потоке
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# локальный сервер с записанными кадрами
+class Fake_Api():
+    '''
+    Отдает кадры по путям: каждый GET на путь возвращает следующий кадр из его списка
+    '''
+    def __init__(self, frames:dict) -> None:
+        self._frames = frames # путь -> список кадров (bytes)
+        self._positions = {path: 0 for path in frames}
+        self._lock = threading.Lock()
+        self._server = None
+        return
+
+    def _next_frame(self, path:str) -> bytes | None:
+        '''
+        :return: следующий кадр для пути или None, если путь неизвестен
+        '''
+        if path not in self._frames:
+            return None
+        with self._lock:
+            position = self._positions[path]
+            self._positions[path] = (position + 1) % len(self._frames[path])
+        return self._frames[path][position]
+
+    def start(self) -> str:
+        '''
+        Запускает сервер на свободном порту localhost
+        :return: базовый url сервера
+        '''
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # keep-alive, как у настоящего api
+
+            def do_GET(self):
+                body = api._next_frame(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                return
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def stop(self) -> None:
+        '''
+        Останавливает сервер
+        '''
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        return
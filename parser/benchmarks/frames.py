@@ -0,0 +1,71 @@
+'''
+Генератор синтетических кадров ленты по образцу frame_example.json.
+Кадры можно масштабировать до тысяч событий: половина событий - матчи eSoccer
+(sport 300), остальные - события других видов спорта с рынками из образца
+'''
+import os # для пути к образцу
+import copy # для копирования шаблонов событий
+import random # для выбора меняющихся матчей
+import ujson as json # для упаковки кадров
+
+EXAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "frame_example.json")
+
+def load_example() -> dict:
+    '''
+    :return: распакованный образец кадра
+    '''
+    with open(EXAMPLE_PATH, encoding="utf-8") as example_file:
+        return json.loads(example_file.read())
+
+def make_frames(events:int, frames:int, changed:float=0.1, providers:int=20, seed:int=42) -> list:
+    '''
+    генерирует последовательность кадров одного эндпоинта: в каждом следующем кадре
+    растет version, а у доли changed матчей меняется счет и версия их провайдера
+    :param events: сколько событий в кадре
+    :param frames: сколько кадров
+    :param changed: доля матчей, у которых счет меняется от кадра к кадру
+    :param providers: сколько разных провайдеров в status
+    :param seed: зерно генератора
+    :return: список кадров, упакованных в json (bytes)
+    '''
+    rng = random.Random(seed)
+    example = load_example()
+    soccer = next(e for e in example["events"].values() if e and "desc" in e and e["desc"]["sport"] == "300")
+    others = [e for e in example["events"].values() if e and e is not soccer]
+    tournament = soccer["desc"]["tournament"]
+    provider_ids = [f"{p_index:08x}" for p_index in range(providers)]
+
+    frame = {
+        "epoch": example["epoch"],
+        "version": example["version"],
+        "generated": example["generated"],
+        "status": {provider: 1 for provider in provider_ids},
+        "sports": example["sports"],
+        "categories": example["categories"],
+        "tournaments": {tournament: example["tournaments"][tournament]},
+        "events": {},
+    }
+    soccer_ids = []
+    for e_index in range(events):
+        event_id = str(2700000000000000000 + e_index)
+        if e_index % 2 == 0:
+            event = copy.deepcopy(soccer)
+            event["desc"]["competitors"][0]["name"] = f"Team {e_index % 200}"
+            event["desc"]["competitors"][1]["name"] = f"Team {(e_index // 200) % 200}"
+            event["state"] = {"provider": provider_ids[e_index % providers], "status": 1, "match_status": 6}
+            event["score"] = {"home_score": "0", "away_score": "0", "period_scores": []}
+            soccer_ids.append(event_id)
+        else:
+            event = copy.deepcopy(others[e_index % len(others)])
+        frame["events"][event_id] = event
+
+    result = []
+    for _ in range(frames):
+        frame["version"] += 1
+        frame["generated"] += 1000
+        for event_id in rng.sample(soccer_ids, int(len(soccer_ids) * changed)):
+            event = frame["events"][event_id]
+            event["score"]["home_score"] = str(int(event["score"]["home_score"]) + 1)
+            frame["status"][event["state"]["provider"]] += 1
+        result.append(json.dumps(frame).encode("utf-8"))
+    return result
@@ -1,5 +1,7 @@
 import ujson as json
+import asyncio # для асинхронного планировщика
 from modules.parser import URL_Parser
+from modules.scheduler import Parser_Scheduler
 from modules.logger import Logger
 
 # получение конфигурационного файла
@@ -23,11 +25,49 @@ def main() -> None:
         url_pattern=config["url_pattern"],
         logger=logger,
         connection_timeout=config["connection_timeout"],
-        time_for_reset=config["time_for_reset"]
+        time_for_reset=config["time_for_reset"],
+        browser_persistent=config["browser_persistent"],
+        browser_max_age=config["browser_max_age"],
+        url_cache_path=config["url_cache_path"],
+        url_cache_ttl=config["url_cache_ttl"],
+        poll_interval=config["poll_interval"],
+        max_workers=config["max_workers"],
+        request_timeout=config["request_timeout"],
+        iteration_timeout=config["iteration_timeout"],
+        log_flush_rows=config["log_flush_rows"],
+        log_flush_interval=config["log_flush_interval"],
+        storage_type=config["storage_type"],
+        match_finish_frames=config["match_finish_frames"],
+        match_max_age=config["match_max_age"],
+        match_store_cap=config["match_store_cap"]
     )
+    # выдача метрик этапов парсера
+    if config["metrics_port"]: # 0 - сервер метрик выключен
+        try:
+            parser.metrics.serve(port=config["metrics_port"])
+            logger.info(f"Metrics are served on http://127.0.0.1:{config['metrics_port']}/metrics")
+        except OSError as e: # порт занят - парсер работает и без метрик
+            logger.error(f"Can't serve metrics on port {config['metrics_port']}, {e}")
+    if config["metrics_dump_path"]:
+        parser.metrics.start_dump(path=config["metrics_dump_path"], interval=config["metrics_dump_interval"], logger=logger)
     # чтобы парсер работал бесконечно
-    while True:
-        parser.main()
+    try:
+        if config["scheduler"] == "async": # независимые задачи опроса каждого эндпоинта
+            scheduler = Parser_Scheduler(
+                parser=parser,
+                logger=logger,
+                poll_interval=config["poll_interval"],
+                max_backoff=config["max_backoff"],
+                discovery_interval=config["discovery_interval"],
+                flush_interval=config["log_flush_interval"],
+                queue_size=config["queue_size"]
+            )
+            asyncio.run(scheduler.run())
+        else: # последовательные итерации поиск -> опрос -> запись
+            while True:
+                parser.main()
+    finally:
+        parser.close()
     return 
 
 # точка входа в главную программу
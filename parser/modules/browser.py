@@ -0,0 +1,115 @@
+import ujson as json # для распаковки сообщений CDP
+import time # для отслеживания возраста сессии
+from selenium import webdriver # для открытия сайта целевого в браузере в headless режиме
+from selenium.common.exceptions import WebDriverException # для отслеживания падений браузера
+
+# долгоживущая сессия браузера
+class Browser_Session():
+    '''
+    Держит один открытый headless Chrome и постепенно вычитывает из него
+    события Network.requestWillBeSent, вместо запуска браузера на каждой итерации
+    '''
+    def __init__(self, parent_url:str, connection_timeout:int, logger:object, max_age:int) -> None:
+        self._parent_url = parent_url # ссылка на первоначальный сайт
+        self._connection_timeout = connection_timeout
+        self._logger = logger
+        self._max_age = max_age # через сколько секунд браузер перезапускается принудительно
+        self._driver = None
+        self._started_at = 0.0
+        return
+
+    def _start(self) -> None:
+        '''
+        Запускает браузер, включает сетевые события CDP и открывает целевую страницу
+        '''
+        options = webdriver.ChromeOptions()
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument("--headless=new")
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        self._driver = webdriver.Chrome(options=options)
+        self._driver.set_page_load_timeout(self._connection_timeout)
+        self._started_at = time.time()
+        self._driver.execute_cdp_cmd("Network.enable", {})
+        self._driver.get(self._parent_url)
+        self._logger.info("Browser session is started")
+        return
+
+    def is_alive(self) -> bool:
+        '''
+        Проверяет, что браузер запущен и отвечает на команды
+        :return: True, если сессией можно пользоваться
+        '''
+        if self._driver is None:
+            return False
+        try:
+            self._driver.execute_script("return document.readyState")
+        except WebDriverException:
+            return False
+        return True
+
+    def is_expired(self) -> bool:
+        '''
+        Проверяет, не превысила ли сессия допустимый возраст
+        '''
+        return self._max_age > 0 and time.time() - self._started_at > self._max_age
+
+    def ensure(self) -> None:
+        '''
+        Перезапускает браузер, если он упал или слишком долго работает.
+        У живой сессии выбрасывается накопившийся лог, чтобы не разбирать устаревшие запросы
+        '''
+        if self.is_alive() and not self.is_expired():
+            self._discard_log()
+            return
+        if self._driver is not None:
+            self._logger.warning("Browser session is dead or expired, restarting")
+        self.close()
+        self._start()
+        return
+
+    def reload(self) -> None:
+        '''
+        Перезагружает страницу, чтобы сайт заново отправил свои запросы
+        '''
+        self._driver.refresh()
+        return
+
+    def _discard_log(self) -> None:
+        '''
+        Выбрасывает без разбора события, накопившиеся пока браузер простаивал
+        (например, пока эндпоинты брались из кэша), чтобы следующий drain_urls
+        вернул только запросы, отправленные страницей сейчас
+        '''
+        self._driver.get_log("performance")
+        return
+
+    def drain_urls(self) -> set:
+        '''
+        Вычитывает накопившиеся с прошлого вызова события performance-лога.
+        Chromedriver отдает каждую запись только один раз, поэтому сам буфер
+        драйвера и является курсором - повторно старые записи не разбираются
+        :return: множество url отправленных страницей запросов
+        '''
+        urls = set() # создание сета для хранения уникальных значений
+        for entry in self._driver.get_log("performance"):
+            message = entry["message"]
+            # дешевая проверка до полного разбора json
+            if "Network.requestWillBeSent" not in message: continue
+            msg = json.loads(message)["message"]
+            if msg.get("method") != "Network.requestWillBeSent": continue
+            url = msg.get("params", {}).get("request", {}).get("url")
+            if url: urls.add(url)
+        return urls
+
+    def close(self) -> None:
+        '''
+        Закрывает браузер, если он был открыт
+        '''
+        if self._driver is None:
+            return
+        try:
+            self._driver.quit()
+        except WebDriverException as e:
+            self._logger.error(f"Error while closing browser, {e}")
+        self._driver = None
+        return
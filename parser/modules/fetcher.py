@@ -0,0 +1,90 @@
+import ujson as json # для быстрой распаковки пакетов
+import time # для замера длительности запросов
+import requests # для получения данных с url-источников
+from requests.adapters import HTTPAdapter # для пула keep-alive соединений
+from concurrent.futures import ThreadPoolExecutor, wait # для параллельных запросов
+
+# параллельный загрузчик данных с эндпоинтов
+class Fetcher():
+    '''
+    Опрашивает эндпоинты параллельно через общий пул keep-alive соединений,
+    чтобы не платить за TCP+TLS рукопожатие на каждый url и не ждать самый медленный
+    '''
+    def __init__(self, max_workers:int, request_timeout:int, iteration_timeout:int, logger:object, metrics:object) -> None:
+        self._request_timeout = request_timeout # дедлайн одного запроса
+        self._iteration_timeout = iteration_timeout # дедлайн на опрос всех url за итерацию
+        self._logger = logger
+        self._metrics = metrics # сборщик метрик этапов
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        return
+
+    def fetch(self, url:str) -> tuple:
+        '''
+        Забирает пакет данных с одного url
+        :param url: строка с url запроса
+        :return: пара (жив ли эндпоинт, пакет данных или None)
+        '''
+        url_data = {}
+        started = time.perf_counter()
+        try:
+            response = self._session.get(url, timeout=self._request_timeout) # получает пакет данных
+            self._metrics.observe("stage_seconds", time.perf_counter() - started, stage="request")
+            self._metrics.inc("bytes_fetched", len(response.content))
+            if 400 <= response.status_code < 500: # эндпоинт пропал или устарел
+                self._logger.warning(f"Endpoint answered {response.status_code}, {url}")
+                self._metrics.inc("request_errors", kind="4xx")
+                return False, None
+            if not response.ok: # сбой на стороне api - тело ответа не пакет, пробуем позже
+                self._logger.error(f"Endpoint answered {response.status_code}, {url}")
+                self._metrics.inc("request_errors", kind="5xx")
+                return True, None
+            with self._metrics.timer("decode"):
+                url_data = json.loads(response.content)
+        except requests.Timeout as e: # обработка ошибки долгого ожидания
+            self._logger.error(f"Time for request is out. Bad connection. {e}")
+            self._metrics.inc("request_errors", kind="timeout")
+            return True, None
+        except requests.RequestException as e: # обработка ошибка bad request
+            self._logger.error(f"Error while connecting with remote host. Bad connection, {e}")
+            self._metrics.inc("request_errors", kind="connection")
+            return True, None
+        except ValueError as e: # в ответе не json
+            self._logger.error(f"Error while decoding payload, {e}")
+            self._metrics.inc("request_errors", kind="decode")
+            return True, None
+
+        if not url_data:
+            self._logger.warning(f"Endpoint returned empty payload, {url}")
+            self._metrics.inc("request_errors", kind="empty")
+            return False, None
+        return True, url_data
+
+    def fetch_all(self, urls:list) -> list:
+        '''
+        Опрашивает все url параллельно в пределах дедлайна итерации
+        :param urls: список url эндпоинтов
+        :return: список пар (жив ли эндпоинт, пакет данных) в том же порядке, что и urls
+        '''
+        futures = [self._executor.submit(self.fetch, url) for url in urls]
+        _, not_done = wait(futures, timeout=self._iteration_timeout)
+        results = []
+        for url, future in zip(urls, futures):
+            if future in not_done: # не успел к дедлайну - считаем временной ошибкой
+                future.cancel()
+                self._logger.error(f"Iteration deadline is reached, skip {url}")
+                results.append((True, None))
+            else:
+                results.append(future.result())
+        return results
+
+    def close(self) -> None:
+        '''
+        Закрывает пул потоков и соединений
+        '''
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._session.close()
+        return
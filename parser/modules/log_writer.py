@@ -0,0 +1,77 @@
+import time # для отслеживания интервала сброса
+
+# буферизированная дозапись журнала парсера
+class Log_Writer():
+    '''
+    Копит строки новых и изменившихся матчей и дописывает их в хранилище пачками.
+    В буфере хранится только последнее состояние каждого матча (upsert),
+    поэтому один и тот же матч не пишется повторно, пока он не изменится
+    '''
+    headers = ["time", "id", "scheduled", "leage", "player_1", "player_2", "score_per_1_home", "score_per_1_away", "res_score_home", "res_score_away"]
+
+    def __init__(self, storage:object, logger:object, flush_rows:int, flush_interval:int, metrics:object) -> None:
+        self._storage = storage # csv или parquet хранилище журнала
+        self._logger = logger
+        self._metrics = metrics # сборщик метрик этапов
+        self._flush_rows = flush_rows # сколько строк копить до сброса на диск
+        self._flush_interval = flush_interval # не дольше скольких секунд держать строки в памяти
+        self._buffer = {} # айди матча -> строка журнала
+        self._last_flush = time.time()
+        return
+
+    def add(self, match_id:str, row:list) -> None:
+        '''
+        Кладет актуальное состояние матча в буфер. На диск буфер сбрасывает tick,
+        поэтому add не работает с диском и может вызываться из цикла событий
+        :param match_id: айди матча
+        :param row: строка журнала в порядке headers
+        '''
+        self._buffer[match_id] = row
+        return
+
+    def is_pending(self, match_id:str) -> bool:
+        '''
+        :return: True, если строка матча еще лежит в буфере и не записана в журнал
+        '''
+        return match_id in self._buffer
+
+    def tick(self) -> None:
+        '''
+        Сбрасывает буфер, если в нем накопилось flush_rows строк
+        или с прошлого сброса прошло больше flush_interval секунд
+        '''
+        if len(self._buffer) >= self._flush_rows or time.time() - self._last_flush >= self._flush_interval:
+            self.flush()
+        return
+
+    def flush(self) -> None:
+        '''
+        Дописывает все накопленные строки в журнал
+        '''
+        self._last_flush = time.time()
+        if not self._buffer:
+            return
+        rows = sorted(self._buffer.values(), key=lambda row: row[2]) # по времени старта
+        with self._metrics.timer("flush"):
+            self._storage.write(rows=rows)
+        self._metrics.inc("rows_written", len(rows))
+        self._buffer = {}
+        self._logger.info(f"Log saved to {self._storage.path} ({len(rows)} rows)")
+        return
+
+    def rotate(self, run_id:str) -> None:
+        '''
+        Сбрасывает буфер в старый журнал и переключается на новый
+        :param run_id: метка нового запуска
+        '''
+        self.flush()
+        self._storage.rotate(run_id=run_id)
+        return
+
+    def close(self) -> None:
+        '''
+        Дописывает остаток буфера и закрывает хранилище при остановке программы
+        '''
+        self.flush()
+        self._storage.close()
+        return
@@ -0,0 +1,83 @@
+from dataclasses import dataclass # для компактных записей о матчах
+from datetime import datetime # для метки времени обнаружения матча
+
+# статусы события в state, означающие, что матч сыгран
+ENDED_STATUSES = (3, 4)
+ENDED_MATCH_STATUS = 100
+
+# запись об одном матче в памяти парсера
+@dataclass(slots=True)
+class Match():
+    '''
+    Компактная запись о матче, хранится в словаре по айди матча
+    '''
+    time: datetime # когда матч впервые попал в парсер
+    id: str # айди матча
+    leage: str # айди турнира, в лог пишется его название
+    scheduled: str # время старта
+    player_1: str # игрок 1
+    player_2: str # игрок 2
+    score_per_1_home: int = 0 # голов у первой команды после 1 тайма
+    score_per_1_away: int = 0 # голов у второй команды после 1 тайма
+    res_score_home: int = 0 # голов у первой команды после игры
+    res_score_away: int = 0 # голов у второй команды после игры
+    version: int | None = None # версия провайдера из status, на которой счет применялся последний раз
+    scheduled_ts: float = 0.0 # время старта в секундах, для вытеснения давно сыгранных матчей
+    stable_frames: int = 0 # сколько пакетов подряд счет не менялся
+
+    ended: bool = False # лента сообщила, что матч завершен
+
+    @staticmethod
+    def parse_score(score:dict) -> tuple:
+        '''
+        :param score: поле score события
+        :return: счет (голы хозяев и гостей после 1 тайма, голы хозяев и гостей после игры).
+        Если счета за 1 тайм еще нет, на его месте стоит None
+        '''
+        first_period = score["period_scores"][0] if len(score["period_scores"]) > 0 else {}
+        return (first_period.get("home_score"), first_period.get("away_score"), int(score["home_score"]), int(score["away_score"]))
+
+    def score(self) -> tuple:
+        '''
+        :return: текущий счет в порядке parse_score
+        '''
+        return (self.score_per_1_home, self.score_per_1_away, self.res_score_home, self.res_score_away)
+
+    def update_score(self, score:dict, version:int | None) -> bool:
+        '''
+        Обновляет счет матча из поля score пакета данных
+        :param score: поле score события
+        :param version: версия провайдера события или None, если она неизвестна
+        :return: True, если счет изменился
+        '''
+        # версия не изменилась - счет тот же самый
+        if version is not None and version == self.version:
+            self.stable_frames += 1
+            return False
+        self.version = version
+        old_score = self.score()
+        per_1_home, per_1_away, self.res_score_home, self.res_score_away = Match.parse_score(score=score)
+        if per_1_home is not None:
+            self.score_per_1_home, self.score_per_1_away = per_1_home, per_1_away
+        if old_score == self.score():
+            self.stable_frames += 1
+            return False
+        self.stable_frames = 0
+        return True
+
+    def update_state(self, state:dict) -> None:
+        '''
+        Запоминает, завершен ли матч, по полю state события
+        (status 3/4 - матч окончен/закрыт, match_status 100 - конец игры)
+        :param state: поле state события
+        '''
+        self.ended = state.get("status") in ENDED_STATUSES or state.get("match_status") == ENDED_MATCH_STATUS
+        return
+
+    def is_finished(self, now:float, finish_frames:int, max_age:int) -> bool:
+        '''
+        Считает матч сыгранным, если лента сообщила о его завершении и счет после этого
+        не менялся finish_frames пакетов подряд, либо с начала прошло больше max_age секунд
+        :param now: текущее время в секундах
+        '''
+        return now - self.scheduled_ts > max_age or (self.ended and self.stable_frames >= finish_frames)
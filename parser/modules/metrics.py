@@ -0,0 +1,190 @@
+import ujson as json # для выгрузки метрик в файл
+import os # для атомарной подмены файла выгрузки
+import threading # метрики пишутся из потоков загрузчика
+import time # для замера длительности этапов
+from contextlib import contextmanager # для замера этапа через with
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer # для локальной выдачи метрик
+
+# границы корзин гистограммы длительностей, в секундах
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# гистограмма одной метрики
+class Histogram():
+    '''
+    Считает число наблюдений по корзинам, их сумму и количество
+    '''
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self) -> None:
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+        return
+
+    def observe(self, value:float) -> None:
+        for b_index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[b_index] += 1
+        self.sum += value
+        self.count += 1
+        return
+
+# сборщик метрик парсера
+class Metrics():
+    '''
+    Хранит счетчики, текущие значения и гистограммы длительностей этапов парсера
+    и отдает их в формате Prometheus по http или периодически в json-файл
+    '''
+    def __init__(self, prefix:str="watchdog") -> None:
+        self._prefix = prefix # общий префикс имен метрик
+        self._lock = threading.Lock()
+        self._counters = {} # (имя, метки) -> значение
+        self._gauges = {}
+        self._histograms = {}
+        return
+
+    def inc(self, name:str, value:float=1, **labels) -> None:
+        '''
+        Увеличивает счетчик
+        '''
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        return
+
+    def set(self, name:str, value:float, **labels) -> None:
+        '''
+        Запоминает текущее значение метрики
+        '''
+        with self._lock:
+            self._gauges[(name, tuple(sorted(labels.items())))] = value
+        return
+
+    def observe(self, name:str, value:float, **labels) -> None:
+        '''
+        Добавляет наблюдение в гистограмму
+        '''
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram()
+            self._histograms[key].observe(value)
+        return
+
+    @contextmanager
+    def timer(self, stage:str):
+        '''
+        Замеряет длительность этапа в гистограмму stage_seconds
+        :param stage: название этапа
+        '''
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - started, stage=stage)
+
+    def _name(self, name:str, labels:tuple, extra:tuple=()) -> str:
+        '''
+        Собирает имя метрики с метками в формате Prometheus
+        '''
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return f"{self._prefix}_{name}"
+        return f"{self._prefix}_{name}{{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+    def render(self) -> str:
+        '''
+        :return: все метрики в текстовом формате Prometheus
+        '''
+        lines = []
+        typed = set() # семейства, для которых уже выведена строка # TYPE
+
+        def add_type(name:str, kind:str) -> None:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {self._prefix}_{name} {kind}")
+
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                add_type(name + "_total", "counter")
+                lines.append(f"{self._name(name + '_total', labels)} {value}")
+            for (name, labels), value in sorted(self._gauges.items()):
+                add_type(name, "gauge")
+                lines.append(f"{self._name(name, labels)} {value}")
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                add_type(name, "histogram")
+                for bound, count in zip(BUCKETS, histogram.counts):
+                    lines.append(f"{self._name(name + '_bucket', labels, (('le', bound),))} {count}")
+                lines.append(f"{self._name(name + '_bucket', labels, (('le', '+Inf'),))} {histogram.count}")
+                lines.append(f"{self._name(name + '_sum', labels)} {histogram.sum}")
+                lines.append(f"{self._name(name + '_count', labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        '''
+        :return: метрики в виде словаря для json-выгрузки
+        '''
+        with self._lock:
+            return {
+                "time": time.time(),
+                "counters": {self._name(name, labels): value for (name, labels), value in self._counters.items()},
+                "gauges": {self._name(name, labels): value for (name, labels), value in self._gauges.items()},
+                "histograms": {
+                    self._name(name, labels): {
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "avg": histogram.sum / histogram.count if histogram.count else 0,
+                        "buckets": dict(zip(map(str, BUCKETS), histogram.counts)),
+                    }
+                    for (name, labels), histogram in self._histograms.items()
+                },
+            }
+
+    def serve(self, port:int) -> ThreadingHTTPServer:
+        '''
+        Поднимает в фоновом потоке http-сервер, отдающий метрики по /metrics
+        :param port: порт на localhost
+        '''
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                return
+
+        server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def start_dump(self, path:str, interval:float, logger:object) -> None:
+        '''
+        Запускает фоновый поток, который раз в interval секунд пишет метрики в json-файл.
+        Файл пишется во временный и подменяется целиком, чтобы читатель не увидел его
+        недописанным, а ошибка записи только логируется и не останавливает выгрузку
+        :param path: путь к файлу
+        :param interval: период выгрузки в секундах
+        :param logger: логгер программы
+        '''
+        def dump_loop() -> None:
+            while True:
+                time.sleep(interval)
+                try:
+                    with open(path + ".tmp", "w", encoding="utf-8") as dump_file:
+                        dump_file.write(json.dumps(self.snapshot(), indent=2))
+                    os.replace(path + ".tmp", path)
+                except OSError as e:
+                    logger.error(f"Can't dump metrics to {path}, {e}")
+
+        threading.Thread(target=dump_loop, daemon=True).start()
+        return
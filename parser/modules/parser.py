@@ -1,10 +1,14 @@
-import ujson as json # для распаковки/упаковки объектов (прокачанная версия)
 import time # для слипов
-from selenium import webdriver # для открытия сайта целевого в браузере в headless режиме
+import sys # для оценки памяти матчей
 from selenium.common.exceptions import TimeoutException # для отслеживания таймаута веб-драйвера
-import requests # для получения данных с url-источников
 from datetime import datetime # для перевода timestamp-меток в нормальный формат
-import pandas as pd # для удобного преобразования в xlsx
+from modules.browser import Browser_Session # долгоживущая сессия браузера
+from modules.url_cache import Url_Cache # кэш найденных эндпоинтов
+from modules.fetcher import Fetcher # параллельный загрузчик эндпоинтов
+from modules.match import Match # компактная запись о матче
+from modules.log_writer import Log_Writer # буферизированная дозапись журнала
+from modules.storage import get_storage # csv/parquet хранилище журнала
+from modules.metrics import Metrics # замеры этапов парсера
 
 # класс парсера целевого сайта
 class URL_Parser():
@@ -12,17 +16,52 @@ class URL_Parser():
     Главынй модуль программы для парсинга данных со страницы
     '''
     # функция инициализации класса парсера
-    def __init__(self, parent_url:str, delay:int, url_pattern:str, logger:object, connection_timeout:int, time_for_reset:int) -> None:
+    def __init__(self, parent_url:str, delay:int, url_pattern:str, logger:object, connection_timeout:int, time_for_reset:int, browser_persistent:bool=True, browser_max_age:int=1800, url_cache_path:str="./url_cache.json", url_cache_ttl:int=600, poll_interval:int=1, max_workers:int=8, request_timeout:int=10, iteration_timeout:int=20, log_flush_rows:int=500, log_flush_interval:int=30, storage_type:str="csv", match_finish_frames:int=30, match_max_age:int=10800, match_store_cap:int=20000) -> None:
         self._parent_url = parent_url # ссылка на первоначальный сайт
         self._url_pattern = url_pattern # что должен содержать url, чтобы подходить под шаблон целевого
         self._delay = delay # временная задержка
         self._logger = logger 
-        self._competitions_all = []
+        self._competitions_all = {} # айди матча -> Match, порядок вставки сохраняется
+        self._changed_ids = {} # журнал изменений: айди матчей, которые надо дописать в лог
+        self._evicted_ids = {} # айди вытесненного матча -> сама запись Match, чтобы вернуть матч при смене счета без desc
+        self._match_finish_frames = match_finish_frames # сколько пакетов подряд счет завершенного матча не должен меняться
+        self._match_max_age = match_max_age # через сколько секунд от начала матч вытесняется в любом случае
+        self._match_store_cap = match_store_cap # сколько матчей держать в памяти максимум
         self._connection_timeout = connection_timeout
         self._log_is_start = False
         self._leages = {}
+        self._frame_versions = {} # url -> (epoch, version) последнего примененного пакета
         self.start_time = time.time()
         self.time_for_reset = time_for_reset
+        self.metrics = Metrics() # длительности этапов, объемы и счетчики
+        self._browser_persistent = browser_persistent # держать ли браузер открытым между итерациями
+        self._browser = Browser_Session(
+            parent_url=parent_url,
+            connection_timeout=connection_timeout,
+            logger=logger,
+            max_age=browser_max_age
+        )
+        self._url_cache = Url_Cache(path=url_cache_path, ttl=url_cache_ttl, logger=logger)
+        self._poll_interval = poll_interval # пауза между прямыми опросами закэшированных url
+        self._fetcher = Fetcher(
+            max_workers=max_workers,
+            request_timeout=request_timeout,
+            iteration_timeout=iteration_timeout,
+            logger=logger,
+            metrics=self.metrics
+        )
+        self._log_writer = Log_Writer(
+            storage=get_storage(
+                storage_type=storage_type,
+                path="./res_logs/",
+                run_id=str(self.start_time),
+                headers=Log_Writer.headers
+            ),
+            logger=logger,
+            flush_rows=log_flush_rows,
+            flush_interval=log_flush_interval,
+            metrics=self.metrics
+        )
         return 
     
     # получает все запросы сайта к внешним ресурсам
@@ -32,70 +71,88 @@ class URL_Parser():
         и фильтрует их по шаблонной строке
         :return: список целевых запросов, а именно их url
         '''
+        started = time.perf_counter()
         try:
-            # отлавливание запросов
-            options = webdriver.ChromeOptions()
-            options.add_argument("--window-size=1920,1080")
-            options.add_argument("--headless=new")
-            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
-            self._driver = webdriver.Chrome(options=options)
-            self._driver.set_page_load_timeout(self._connection_timeout)
             try:
-                self._driver.execute_cdp_cmd("Network.enable", {})
-                self._driver.get(self._parent_url)
+                self._browser.ensure()
             except TimeoutException as e:
                 self._logger.error(f"Error while connecting to host, {e}")
+                self._browser.close()
                 return []
             self._logger.info(f"Wait {self._delay} sec")
             # та самая задержка 
-            time.sleep(self._delay)
-            logs = self._driver.get_log("performance")
-            urls = set() # создание сета для хранения уникальных значений
-            for entry in logs:
-                msg = json.loads(entry["message"])["message"]
-                if msg.get("method") != "Network.requestWillBeSent": continue
-                req = msg.get("params", {}).get("request", {})
-                url = req.get("url")
-                if url: urls.add(url)
+            with self.metrics.timer("delay"):
+                time.sleep(self._delay)
+            urls = self._browser.drain_urls()
+            # если за delay страница ничего не запросила - перезагружаем ее
+            if self._browser_persistent and not self._has_live_urls(urls):
+                self._logger.info("No new requests from page, reloading it")
+                self._browser.reload()
+                with self.metrics.timer("delay"):
+                    time.sleep(self._delay)
+                urls = self._browser.drain_urls()
 
             # проверка соответствия элемента шаблону
             score_urls = []
-            for url in urls:
+            for url in sorted(urls):
                 if self._url_pattern in url: score_urls.append(url)
         except Exception as e:
             self._logger.error(f"Error while connecting remote host, {e}")
+            # сессия могла упасть - на следующей итерации она поднимется заново
+            self._browser.close()
             return []       
         finally:
-            self._driver.quit()
+            if not self._browser_persistent:
+                self._browser.close()
+            self.metrics.observe("stage_seconds", time.perf_counter() - started, stage="discovery")
         return score_urls
-    
-    def _is_this_event(self, event_id:int) -> int | None:
+
+    def _has_live_urls(self, urls:set) -> bool:
         '''
-        Проверяет есть ли элемент с айди event_id в памяти
-        :param event_id: айди целевого ивента
-        :return: индекс ивента в общем списке или ничего
+        Проверяет, есть ли среди запросов хотя бы один подходящий под шаблон
         '''
-        for event_index, event in enumerate(self._competitions_all):
-            if int(event_id) == int(event["id"]): 
-                return event_index 
-        return None
+        return any(self._url_pattern in url for url in urls)
     
     # вытасиквает данные с переданного url
-    def get_data_from_url(self, url:str) -> None:
+    def get_data_from_url(self, url:str) -> bool:
         '''
         вытягивает всю необходимую информацию из запроса, формирует пакет с competition
         и добавляет его в общий список в памяти
         :param url: строка с url запроса
+        :return: False, если эндпоинт больше не отдает данные (ответ 4xx или пустой пакет)
         '''
-        url_data = {}
-        try:
-            url_data = requests.get(url, timeout=self._connection_timeout).json() # получает пакет данных
-        except requests.Timeout as e: # обработка ошибки долгого ожидания
-            self._logger.error(f"Time for request is out. Bad connection. {e}") 
-            return None
-        except requests.RequestException as e: # обработка ошибка bad request
-            self._logger.error(f"Error while connecting with remote host. Bad connection, {e}")
-            return None
+        is_alive, url_data = self._fetcher.fetch(url)
+        if url_data:
+            self.apply_data(url=url, url_data=url_data)
+        return is_alive
+
+    # раскладывает пакет данных по матчам в памяти
+    def apply_data(self, url:str, url_data:dict) -> None:
+        '''
+        применяет пакет данных к матчам в памяти с замером длительности
+        :param url: url, с которого пришел пакет
+        :param url_data: распакованный пакет данных одного эндпоинта
+        '''
+        with self.metrics.timer("merge"):
+            self._merge_frame(url=url, url_data=url_data)
+        return None
+
+    def _merge_frame(self, url:str, url_data:dict) -> None:
+        '''
+        формирует из пакета competition и добавляет/обновляет их в общем списке.
+        Пакет с теми же epoch/version, что и прошлый с этого url, пропускается целиком,
+        а счет матча применяется только при смене версии его провайдера в status
+        :param url: url, с которого пришел пакет
+        :param url_data: распакованный пакет данных одного эндпоинта
+        '''
+        frame_version = (url_data.get("epoch"), url_data.get("version"))
+        if frame_version[1] is not None:
+            if self._frame_versions.get(url) == frame_version:
+                self._logger.info(f"Frame version is not changed, skip {url}")
+                self.metrics.inc("frames_skipped")
+                return None
+            self._frame_versions[url] = frame_version
+        status = url_data.get("status") or {}
 
         if "tournaments" in url_data.keys():
             for t_key in url_data["tournaments"].keys():
@@ -103,90 +160,233 @@ class URL_Parser():
 
         # проверка на наличие поля
         if "events" in url_data.keys():
-            for event_id in url_data["events"].keys(): # в events хранится информация о матчах
-                event = url_data["events"][event_id]
-                is_this_event = self._is_this_event(event_id=event_id)
-                if event and ("desc" in event.keys()) and (event["desc"]["sport"] == "300"): # в desc хранится описание матча - кто играет и на какое время запланировано
-                    # print(json.dumps(event, indent=2), "\n")
-                    competition = { # итоговый объект для сохранения в БД
-                        "time": datetime.now(),
-                        "id": event_id, # айди матча
-                        "leage": event["desc"]["tournament"],
-                        "scheduled": datetime.fromtimestamp(event["desc"]["scheduled"]).strftime("%Y-%m-%d %H:%M:%S"), # время старта
-                        "player_1": event["desc"]["competitors"][0]["name"], # игрок 1
-                        "player_2": event["desc"]["competitors"][1]["name"], # игрок 2
-                        "score_per_1_home": 0, # голов у первой команды после 1 тайма
-                        "score_per_1_away": 0, # голов у второй команды после 1 тайма
-                        "res_score_home": 0, # голов у первой команды после игры
-                        "res_score_away": 0, # голов у второй команды после игры
-                    }
-                    if is_this_event is None:
-                        self._competitions_all.append(competition) 
+            self.metrics.inc("events_processed", len(url_data["events"]))
+            for event_id, event in url_data["events"].items(): # в events хранится информация о матчах
+                if not event: continue
+                match = self._competitions_all.get(event_id)
+                is_evicted = match is None and event_id in self._evicted_ids
+                if is_evicted: # счет сравнивается с сохраненной записью, desc для этого не нужен
+                    match = self._evicted_ids[event_id]
+                if match is None and ("desc" in event) and (event["desc"]["sport"] == "300"): # в desc хранится описание матча - кто играет и на какое время запланировано
+                    match = Match( # итоговый объект для сохранения в БД
+                        time=datetime.now(),
+                        id=event_id,
+                        leage=event["desc"]["tournament"],
+                        scheduled=datetime.fromtimestamp(event["desc"]["scheduled"]).strftime("%Y-%m-%d %H:%M:%S"),
+                        player_1=event["desc"]["competitors"][0]["name"],
+                        player_2=event["desc"]["competitors"][1]["name"],
+                        scheduled_ts=event["desc"]["scheduled"]
+                    )
+                    self._competitions_all[event_id] = match
+                    self._changed_ids[event_id] = None
                 
+                if match is None: continue
+                state = event.get("state") or {}
+                if "state" in event: # без state лента ничего не сообщает о завершении матча
+                    match.update_state(state=state)
                 # обработка голов
-                if event and ("score" in event.keys()) and (is_this_event):
-                    if len(event["score"]["period_scores"]) > 0: 
-                        self._competitions_all[is_this_event]["score_per_1_home"] = event["score"]["period_scores"][0]["home_score"]
-                        self._competitions_all[is_this_event]["score_per_1_away"] = event["score"]["period_scores"][0]["away_score"]
-                    self._competitions_all[is_this_event]["res_score_home"] = int(event["score"]["home_score"])
-                    self._competitions_all[is_this_event]["res_score_away"] = int(event["score"]["away_score"])    
+                if "score" in event:
+                    if match.update_score(score=event["score"], version=status.get(state.get("provider"))):
+                        if is_evicted:
+                            self._readmit_match(match=match)
+                        self._changed_ids[event_id] = None
         return None
     
+    def _readmit_match(self, match:Match) -> None:
+        '''
+        Возвращает в память вытесненный матч, у которого изменился счет:
+        так ошибочно вытесненный матч не теряет голы, а log_stat все равно берет максимум по айди
+        :param match: запись матча из списка вытесненных
+        '''
+        del self._evicted_ids[match.id]
+        self._competitions_all[match.id] = match
+        self.metrics.inc("matches_readmitted")
+        self._logger.warning(f"Evicted match {match.id} changed its score, tracking it again")
+        return
+
     def check_leage(self, leage:str) -> str:
-        if self._leages[leage]:
-            return self._leages[leage]
+        return self._leages.get(leage)
+
     
     def write_log(self,  data:list) -> None:
         '''
-        Записывает собранную информацию в журнал - лог
-        :param data: список все событий, собранных парсером
-        '''
-        self._logger.warning("Log saving is started. Don't close the program")
-        
-        csv_path = f"./res_logs/parser_results_{self.start_time}.csv"
-        headers = ["time", "id", "scheduled", "leage", "player_1", "player_2", "score_per_1_home", "score_per_1_away", "res_score_home", "res_score_away"]
-        
-        log_dict = {h: [d.get(h) for d in data] for h in headers}
-        df = pd.DataFrame(log_dict)
-        
-        df["time"] = pd.to_datetime(df["time"])
-        df["scheduled"] = pd.to_datetime(df["scheduled"])
-        df = df.sort_values("scheduled")
-        df["leage"] = df["leage"].apply(self.check_leage)
-
-        df.to_csv(
-            csv_path,
-            sep=";",
-            index=False,
-            header=(not pd.io.common.file_exists(csv_path)),
-            encoding="utf-8-sig"
-        )
-        self._logger.info(f"Log saved to {csv_path} ({len(data)} rows)")
-
+        Передает в буфер журнала новые и изменившиеся матчи, на диск он сбрасывается в flush_log
+        :param data: список матчей (Match), изменившихся с прошлой записи
+        '''
+        with self.metrics.timer("write_log"):
+            for match in data:
+                self._log_writer.add(match_id=match.id, row=[
+                    match.time, match.id, match.scheduled, self.check_leage(match.leage),
+                    match.player_1, match.player_2,
+                    match.score_per_1_home, match.score_per_1_away, match.res_score_home, match.res_score_away
+                ])
         return 
 
-    # освобождает память от старых записей и изменяет метку времени
-    def _reset_parser(self) -> None:
+    # переключает журнал на новый файл и изменяет метку времени
+    def _rotate_log(self) -> None:
         '''
-        перезагружает память парсера, чтобы он работал бесконечно
+        начинает новый журнал, матчи в памяти при этом не трогаются -
+        память освобождается вытеснением сыгранных матчей (_evict_matches)
         '''
-        self._competitions_all = []
-        self.start_time = time.time()        
-        self._logger.warning("Pareser is reseted")
-        return 
+        self.start_time = time.time()
+        self._log_writer.rotate(run_id=str(self.start_time))
+        self._logger.info("Log is rotated")
+        return
+
+    # освобождает память от сыгранных матчей
+    def _evict_matches(self) -> None:
+        '''
+        Убирает из памяти сыгранные матчи, строки которых уже записаны в журнал.
+        Если матчей все равно больше match_store_cap - вытесняются самые старые матчи,
+        чтобы память не росла бесконечно: их последние строки уже лежат в буфере журнала
+        '''
+        now = time.time()
+        finished = [
+            match_id for match_id, match in self._competitions_all.items()
+            if match.is_finished(now=now, finish_frames=self._match_finish_frames, max_age=self._match_max_age)
+            and not self._log_writer.is_pending(match_id)
+        ]
+        for match_id in finished:
+            self._forget_match(match_id=match_id)
+        if finished:
+            self.metrics.inc("matches_evicted", len(finished), reason="finished")
+
+        overflow = len(self._competitions_all) - self._match_store_cap
+        if overflow > 0:
+            self._logger.warning(f"Match store is over the cap, evicting {overflow} oldest matches")
+            for match_id in list(self._competitions_all)[:overflow]: # словарь хранит порядок вставки
+                self._forget_match(match_id=match_id)
+            self.metrics.inc("matches_evicted", overflow, reason="cap")
+        return
+
+    def _forget_match(self, match_id:str) -> None:
+        '''
+        Убирает матч из рабочей памяти в список вытесненных: сыгранный матч, еще висящий в ленте,
+        не заводится заново, а при смене счета возвращается вместе со своим описанием.
+        Список ограничен тем же match_store_cap
+        '''
+        self._evicted_ids[match_id] = self._competitions_all.pop(match_id)
+        if len(self._evicted_ids) > self._match_store_cap:
+            del self._evicted_ids[next(iter(self._evicted_ids))]
+        return
     
+    # освобождает внешние ресурсы парсера
+    def close(self) -> None:
+        '''
+        закрывает браузер и дописывает остаток журнала при остановке программы
+        '''
+        self._log_writer.close()
+        self._browser.close()
+        self._fetcher.close()
+        return
+
+    # опрашивает список url и отбирает живые
+    def _fetch_urls(self, urls:list) -> list:
+        '''
+        Забирает данные со всех url параллельно и применяет их в порядке списка,
+        чтобы результат не зависел от того, какой ответ пришел первым
+        :param urls: список url эндпоинтов
+        :return: список url, которые все еще отдают данные
+        '''
+        self._logger.info(f"Fetching {len(urls)} urls")
+        alive_urls = []
+        for url, (is_alive, url_data) in zip(urls, self._fetcher.fetch_all(urls=urls)):
+            if url_data:
+                self.apply_data(url=url, url_data=url_data)
+            if is_alive:
+                alive_urls.append(url)
+        return alive_urls
+
+    # отдает список эндпоинтов для опроса
+    def discover_urls(self) -> list:
+        '''
+        Берет эндпоинты из кэша, а если он устарел - ищет их браузером.
+        Найденные браузером url пробно опрашиваются, и в кэш (как и в последовательном режиме)
+        попадают только ответившие. Данные пробы не применяются: метод работает
+        в отдельном потоке, а матчи меняет только задача разбора планировщика
+        :return: список url эндпоинтов
+        '''
+        urls = self._url_cache.get()
+        if not urls:
+            urls = self._get_live_urls()
+            urls = [url for url, (is_alive, _) in zip(urls, self._fetcher.fetch_all(urls=urls)) if is_alive]
+            self._url_cache.put(urls)
+        return urls
+
+    # сбрасывает кэш эндпоинтов
+    def invalidate_urls(self) -> None:
+        self._url_cache.invalidate()
+        return
+
+    # забирает пакет данных с одного url без применения
+    def fetch_url(self, url:str) -> tuple:
+        '''
+        :param url: строка с url запроса
+        :return: пара (жив ли эндпоинт, пакет данных или None)
+        '''
+        return self._fetcher.fetch(url)
+
+    # передает изменения в журнал и освобождает память от сыгранных матчей
+    def write_changes(self) -> None:
+        '''
+        Отдает изменения в журнал и дописывает его на диск, если пора
+        '''
+        self.collect_changes()
+        self.flush_log()
+        return
+
+    def collect_changes(self) -> None:
+        '''
+        Кладет в буфер журнала матчи из журнала изменений и вытесняет сыгранные матчи.
+        Работает только с памятью, поэтому планировщик вызывает ее прямо в цикле событий
+        '''
+        self.write_log(data=[self._competitions_all[match_id] for match_id in self._changed_ids])
+        self._changed_ids = {}
+        self._evict_matches()
+        # размер хранилища матчей: словарь плюс записи фиксированного размера (__slots__)
+        matches_count = len(self._competitions_all)
+        matches_bytes = sys.getsizeof(self._competitions_all)
+        if matches_count:
+            matches_bytes += matches_count * sys.getsizeof(next(iter(self._competitions_all.values())))
+        self.metrics.set("matches", matches_count)
+        self.metrics.set("matches_bytes", matches_bytes)
+        return
+
+    def flush_log(self) -> None:
+        '''
+        Дописывает буфер журнала на диск, если пора, и начинает новый файл журнала
+        по time_for_reset. Это вся работа с диском, поэтому планировщик выносит ее
+        в отдельный поток; буфер при этом не меняется - collect_changes ждет ее окончания
+        '''
+        self._log_writer.tick()
+        # новый файл журнала, от памяти это больше не зависит
+        if time.time() - self.start_time > self.time_for_reset:
+            self._rotate_log()
+        return
+
     # главная точка входа в класс
     def main(self) -> None:
+        with self.metrics.timer("iteration"):
+            self._iteration()
+        return
+
+    # одна последовательная итерация поиск -> опрос -> запись
+    def _iteration(self) -> None:
         self._logger.info("Parser iteration is started")
-        urls = self._get_live_urls()
-        for u_index, url in enumerate(urls):
-            self._logger.info(f"Doing {u_index}/{len(urls)-1}")
-            self.get_data_from_url(url=url)
-        self.write_log(data=self._competitions_all)
-        
-        # освобождение памяти для новых записей
-        if time.time() - self.start_time > self.time_for_reset:
-            self._reset_parser()
+        urls = self._url_cache.get()
+        if urls:
+            # прямой опрос без браузера, пока кэш свежий
+            if len(self._fetch_urls(urls=urls)) < len(urls):
+                self._url_cache.invalidate()
+                urls = []
+            else:
+                with self.metrics.timer("poll_sleep"):
+                    time.sleep(self._poll_interval)
+        if not urls:
+            # кэш устарел или сломался - ищем эндпоинты браузером
+            urls = self._get_live_urls()
+            self._url_cache.put(self._fetch_urls(urls=urls))
+        self.write_changes()
         return
 
 # точка входа в программу
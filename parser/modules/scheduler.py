@@ -0,0 +1,115 @@
+import asyncio # для независимых задач опроса
+
+# асинхронный планировщик парсера
+class Parser_Scheduler():
+    '''
+    Запускает поиск эндпоинтов, опрос каждого эндпоинта, разбор пакетов и сброс журнала
+    независимыми asyncio-задачами, связанными очередью. Медленный эндпоинт или
+    поиск через браузер больше не задерживают обновления с остальных эндпоинтов
+    '''
+    def __init__(self, parser:object, logger:object, poll_interval:float, max_backoff:float, discovery_interval:float, flush_interval:float, queue_size:int) -> None:
+        self._parser = parser # экземпляр URL_Parser
+        self._logger = logger
+        self._poll_interval = poll_interval # пауза между опросами одного эндпоинта
+        self._max_backoff = max_backoff # максимальная пауза при ошибках эндпоинта
+        self._discovery_interval = discovery_interval # как часто заново искать эндпоинты
+        self._flush_interval = flush_interval # как часто проверять журнал, если пакетов нет
+        self._queue_size = queue_size # сколько пакетов может ждать разбора
+        self._pollers = {} # url -> задача опроса
+        return
+
+    async def _discover(self) -> None:
+        '''
+        Ищет эндпоинты (браузер работает в отдельном потоке) и запускает/останавливает
+        задачи опроса. Срабатывает по таймеру или когда эндпоинт перестал отвечать.
+        Повторный поиск из-за пропавшего эндпоинта или пустого результата идет с паузой,
+        которая растет вдвое до max_backoff, чтобы не запускать браузер в цикле
+        '''
+        failures = 0
+        while True:
+            self._rediscover.clear() # до поиска: сигнал, пришедший во время поиска, не теряется
+            urls = await asyncio.to_thread(self._parser.discover_urls)
+            for url in set(self._pollers) - set(urls):
+                self._pollers.pop(url).cancel()
+            for url in urls:
+                if url not in self._pollers:
+                    self._pollers[url] = asyncio.create_task(self._poll(url=url))
+            self._logger.info(f"Polling {len(self._pollers)} endpoints")
+            backoff = min(self._poll_interval * 2 ** failures, self._max_backoff)
+            if not self._pollers:
+                failures += 1
+                await asyncio.sleep(backoff)
+                continue
+            try:
+                await asyncio.wait_for(self._rediscover.wait(), timeout=self._discovery_interval)
+            except asyncio.TimeoutError:
+                failures = 0 # эндпоинты отработали весь интервал
+            else:
+                failures += 1
+                await asyncio.sleep(backoff)
+
+    async def _poll(self, url:str) -> None:
+        '''
+        Опрашивает один эндпоинт со своим интервалом и кладет пакеты в очередь разбора.
+        При временных ошибках пауза растет вдвое до max_backoff. Непредвиденная ошибка
+        тоже считается временной, чтобы задача не умерла молча, оставшись в списке опроса
+        :param url: url эндпоинта
+        '''
+        failures = 0
+        while True:
+            try:
+                is_alive, url_data = await asyncio.to_thread(self._parser.fetch_url, url)
+            except Exception as e:
+                self._logger.exception(f"Unexpected error while polling {url}, {e}")
+                is_alive, url_data = True, None
+            if not is_alive: # эндпоинт пропал - ищем эндпоинты заново
+                self._pollers.pop(url, None)
+                self._parser.invalidate_urls()
+                self._rediscover.set()
+                return
+            if url_data:
+                failures = 0
+                await self._frames.put((url, url_data))
+            else:
+                failures += 1
+            await asyncio.sleep(min(self._poll_interval * 2 ** failures, self._max_backoff))
+
+    async def _parse(self) -> None:
+        '''
+        Разбирает пакеты по одному, поэтому матчи в памяти меняются только в этой задаче
+        и в collect_changes задачи сброса, которые обе работают в цикле событий
+        '''
+        while True:
+            url, url_data = await self._frames.get()
+            self._parser.metrics.set("queue_size", self._frames.qsize())
+            self._parser.apply_data(url=url, url_data=url_data)
+            self._frames.task_done()
+
+    async def _flush(self) -> None:
+        '''
+        Раз в flush_interval передает изменения в буфер журнала прямо в цикле событий,
+        а запись на диск (сброс буфера, ротация и склейка файлов) выполняет в отдельном потоке,
+        чтобы не останавливать опрос эндпоинтов. Следующая передача ждет окончания записи
+        '''
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            self._parser.collect_changes()
+            await asyncio.to_thread(self._parser.flush_log)
+
+    async def run(self) -> None:
+        '''
+        Запускает все задачи и работает, пока программу не остановят
+        '''
+        self._frames = asyncio.Queue(maxsize=self._queue_size)
+        self._rediscover = asyncio.Event()
+        tasks = [
+            asyncio.create_task(self._discover()),
+            asyncio.create_task(self._parse()),
+            asyncio.create_task(self._flush()),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks + list(self._pollers.values()):
+                task.cancel()
+        return
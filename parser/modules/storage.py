@@ -0,0 +1,142 @@
+import csv # для записи строк журнала без pandas
+import os # для путей журналов
+from datetime import datetime # для разбора времени старта матча
+
+# хранилище журнала в csv
+class Csv_Storage():
+    '''
+    Дописывает строки журнала в csv-файл parser_results_{run_id}.csv через ";"
+    '''
+    def __init__(self, path:str, run_id:str, headers:list) -> None:
+        self._dir = path # папка с журналами
+        self._headers = headers
+        self.rotate(run_id=run_id)
+        return
+
+    def rotate(self, run_id:str) -> None:
+        '''
+        Переключает хранилище на новый файл журнала
+        :param run_id: метка запуска, входит в имя файла
+        '''
+        self.path = os.path.join(self._dir, f"parser_results_{run_id}.csv")
+        return
+
+    def close(self) -> None:
+        '''
+        Файл открывается только на время записи, закрывать нечего
+        '''
+        return
+
+    def write(self, rows:list) -> None:
+        '''
+        Дописывает строки в конец журнала
+        :param rows: строки журнала в порядке headers
+        '''
+        is_new_file = not os.path.exists(self.path)
+        with open(self.path, "a", newline="", encoding="utf-8-sig") as log_file:
+            writer = csv.writer(log_file, delimiter=";")
+            if is_new_file:
+                writer.writerow(self._headers)
+            writer.writerows(rows)
+        return
+
+# хранилище журнала в parquet
+class Parquet_Storage():
+    '''
+    Пишет строки журнала в parquet-датасет с разбиением по дню старта и лиге
+    (res_logs/parquet/date=.../leage=.../part-{run_id}-{n}-0.parquet).
+    Каждый сброс пишется отдельным файлом, чтобы записанное не терялось при падении,
+    а при ротации и закрытии файлы запуска склеиваются в один на раздел (part-{run_id}.parquet).
+    Колонки типизированы: int64 айди, timestamp для времени, int8 для счета,
+    словарное кодирование для названий команд
+    '''
+    def __init__(self, path:str, run_id:str, headers:list) -> None:
+        import pyarrow as pa # опциональная зависимость, нужна только для этого хранилища
+        import pyarrow.parquet as pq
+        self._pa = pa
+        self._pq = pq
+        self._headers = headers
+        self.path = os.path.join(path, "parquet")
+        self._schema = pa.schema([
+            ("time", pa.timestamp("us")),
+            ("id", pa.int64()),
+            ("scheduled", pa.timestamp("s")),
+            ("leage", pa.string()),
+            ("player_1", pa.dictionary(pa.int32(), pa.string())),
+            ("player_2", pa.dictionary(pa.int32(), pa.string())),
+            ("score_per_1_home", pa.int8()),
+            ("score_per_1_away", pa.int8()),
+            ("res_score_home", pa.int8()),
+            ("res_score_away", pa.int8()),
+            ("date", pa.string()),
+        ])
+        self.rotate(run_id=run_id)
+        return
+
+    def rotate(self, run_id:str) -> None:
+        '''
+        Склеивает файлы прошлого запуска и начинает новую серию файлов датасета
+        :param run_id: метка запуска, входит в имена файлов
+        '''
+        if hasattr(self, "_run_id"):
+            self.close()
+        self._run_id = run_id
+        self._part = 0 # номер сброса внутри запуска
+        self._parts = {} # папка раздела -> файлы сбросов этого запуска
+        return
+
+    def close(self) -> None:
+        '''
+        Склеивает файлы сбросов текущего запуска в один файл на раздел.
+        Склейка пишется во временный файл и подменяет итоговый атомарно, а файлы сбросов
+        удаляются только после этого: при падении посередине остаются дубли строк,
+        которые log_stat все равно схлопывает по айди
+        '''
+        for partition, parts in self._parts.items():
+            if len(parts) < 2:
+                continue
+            # ParquetFile, а не read_table: иначе колонки разделов добавятся из пути
+            table = self._pa.concat_tables([self._pq.ParquetFile(part).read() for part in parts])
+            target = os.path.join(partition, f"part-{self._run_id}.parquet")
+            self._pq.write_table(table, target + ".tmp")
+            os.replace(target + ".tmp", target)
+            for part in parts:
+                os.remove(part)
+        self._parts = {}
+        return
+
+    def write(self, rows:list) -> None:
+        '''
+        Дописывает строки в датасет отдельными файлами в нужные разделы
+        :param rows: строки журнала в порядке headers
+        '''
+        columns = {h: [row[i] for row in rows] for i, h in enumerate(self._headers)}
+        columns["id"] = [int(match_id) for match_id in columns["id"]]
+        columns["scheduled"] = [datetime.strptime(scheduled, "%Y-%m-%d %H:%M:%S") for scheduled in columns["scheduled"]]
+        columns["leage"] = [leage or "unknown" for leage in columns["leage"]]
+        columns["date"] = [scheduled.strftime("%Y-%m-%d") for scheduled in columns["scheduled"]]
+        table = self._pa.Table.from_pydict(columns, schema=self._schema)
+        self._pq.write_to_dataset(
+            table,
+            root_path=self.path,
+            partition_cols=["date", "leage"],
+            basename_template=f"part-{self._run_id}-{self._part}-{{i}}.parquet",
+            file_visitor=lambda written_file: self._parts.setdefault(os.path.dirname(written_file.path), []).append(written_file.path)
+        )
+        self._part += 1
+        return
+
+# выбор хранилища по конфигурации
+def get_storage(storage_type:str, path:str, run_id:str, headers:list) -> Csv_Storage | Parquet_Storage:
+    '''
+    Создает хранилище журнала нужного типа
+    :param storage_type: csv или parquet
+    :param path: папка с журналами
+    :param run_id: метка запуска
+    :param headers: названия колонок журнала
+    :return: объект хранилища
+    '''
+    storages = {"csv": Csv_Storage, "parquet": Parquet_Storage}
+    if storage_type not in storages:
+        raise ValueError(f"Unknown storage type {storage_type}, expected one of {list(storages)}")
+    return storages[storage_type](path=path, run_id=run_id, headers=headers)
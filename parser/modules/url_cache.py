@@ -0,0 +1,79 @@
+import ujson as json # для сохранения кэша на диск
+import time # для проверки срока жизни кэша
+import os # для проверки наличия файла кэша
+
+# кэш найденных через браузер url
+class Url_Cache():
+    '''
+    Хранит url живых эндпоинтов, найденных браузером, чтобы опрашивать их
+    напрямую без повторного запуска Selenium, пока не истечет ttl
+    '''
+    def __init__(self, path:str, ttl:int, logger:object) -> None:
+        self._path = path # файл, в котором кэш переживает перезапуск программы
+        self._ttl = ttl # сколько секунд кэш считается свежим, 0 - кэш выключен
+        self._logger = logger
+        self._urls = []
+        self._updated = 0.0
+        self._load()
+        return
+
+    def _load(self) -> None:
+        '''
+        Подгружает кэш с диска, если он там есть
+        '''
+        if not os.path.exists(self._path):
+            return
+        try:
+            with open(self._path, encoding="utf-8") as cache_file:
+                cache = json.loads(cache_file.read())
+            self._urls = list(cache["urls"])
+            self._updated = float(cache["updated"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self._logger.error(f"Error while reading url cache, {e}")
+        return
+
+    def _save(self) -> None:
+        '''
+        Сохраняет кэш на диск
+        '''
+        try:
+            with open(self._path, "w", encoding="utf-8") as cache_file:
+                cache_file.write(json.dumps({"updated": self._updated, "urls": self._urls}))
+        except OSError as e:
+            self._logger.error(f"Error while saving url cache, {e}")
+        return
+
+    def get(self) -> list:
+        '''
+        :return: список закэшированных url или пустой список, если кэш устарел
+        '''
+        if self._ttl <= 0 or not self._urls:
+            return []
+        if time.time() - self._updated > self._ttl:
+            self._logger.info("Url cache is stale")
+            return []
+        return list(self._urls)
+
+    def put(self, urls:list) -> None:
+        '''
+        Запоминает свежий список url
+        :param urls: url, найденные браузером
+        '''
+        if self._ttl <= 0 or not urls:
+            return
+        self._urls = sorted(urls)
+        self._updated = time.time()
+        self._save()
+        return
+
+    def invalidate(self) -> None:
+        '''
+        Сбрасывает кэш, чтобы на следующем шаге url были найдены браузером заново
+        '''
+        if not self._urls:
+            return
+        self._logger.warning("Url cache is invalidated")
+        self._urls = []
+        self._updated = 0.0
+        self._save()
+        return